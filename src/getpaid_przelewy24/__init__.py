@@ -1,7 +1,8 @@
 """Przelewy24 payment gateway integration for python-getpaid ecosystem."""
 
-# Lazy imports — client and processor are defined in later tasks.
-# This avoids ImportError when only types.py is implemented so far.
+# Lazy imports — importing the package (e.g. for ``types`` or entry
+# point discovery) does not pull in httpx, getpaid-core or transitions
+# until P24Client or P24Processor is actually requested.
 
 __version__ = "3.0.0a2"
 
@@ -17,6 +17,11 @@ from .types import VerifyResponse
 SANDBOX_URL = "https://sandbox.przelewy24.pl"
 PRODUCTION_URL = "https://secure.przelewy24.pl"
 
+# Shared encoders for sign payloads and request bodies; ``json.dumps``
+# with non-default options builds a fresh encoder on every call.
+_SIGN_ENCODER = json.JSONEncoder(separators=(",", ":"))
+_BODY_ENCODER = json.JSONEncoder(default=str)
+
 
 class P24Client:
     """Async client for Przelewy24 REST API.
@@ -27,6 +32,10 @@ class P24Client:
 
         async with P24Client(...) as client:
             await client.register_transaction(...)
+
+    Alternatively, pass a long-lived ``http_client`` owned by the
+    application; it is used for every call and never closed by
+    ``P24Client``.
     """
 
     last_response: httpx.Response | None = None
@@ -39,20 +48,68 @@ class P24Client:
         api_key: str,
         crc_key: str,
         sandbox: bool = True,
+        http_client: httpx.AsyncClient | None = None,
     ) -> None:
         self.merchant_id = merchant_id
-        self.pos_id = pos_id
-        self.api_key = api_key
+        self._pos_id = pos_id
+        self._api_key = api_key
+        self._update_auth()
         self.crc_key = crc_key
         self.base_url = SANDBOX_URL if sandbox else PRODUCTION_URL
-        self._client: httpx.AsyncClient | None = None
+        self._client: httpx.AsyncClient | None = http_client
         self._owns_client: bool = False
 
-    async def __aenter__(self) -> "P24Client":
-        self._client = httpx.AsyncClient(
-            auth=(str(self.pos_id), self.api_key),
+    @property
+    def base_url(self) -> str:
+        """Gateway origin; every endpoint URL is derived from it."""
+        return self._base_url
+
+    @base_url.setter
+    def base_url(self, value: str) -> None:
+        self._base_url = value
+        api_url = f"{value}/api/v1"
+        self._url_test_access = f"{api_url}/testAccess"
+        self._url_register = f"{api_url}/transaction/register"
+        self._url_verify = f"{api_url}/transaction/verify"
+        self._url_refund = f"{api_url}/transaction/refund"
+        self._url_transaction_by_session = (
+            f"{api_url}/transaction/by/sessionId/"
         )
-        self._owns_client = True
+        self._url_refund_by_order = f"{api_url}/refund/by/orderId/"
+        self._url_payment_methods = f"{api_url}/payment/methods/"
+        self._url_redirect = f"{value}/trnRequest/"
+
+    @property
+    def pos_id(self) -> int:
+        """POS ID, used as the Basic Auth username."""
+        return self._pos_id
+
+    @pos_id.setter
+    def pos_id(self, value: int) -> None:
+        self._pos_id = value
+        self._update_auth()
+
+    @property
+    def api_key(self) -> str:
+        """REST API key, used as the Basic Auth password."""
+        return self._api_key
+
+    @api_key.setter
+    def api_key(self, value: str) -> None:
+        self._api_key = value
+        self._update_auth()
+
+    def _update_auth(self) -> None:
+        """Rebuild the Basic Auth sent with every request."""
+        self._auth = httpx.BasicAuth(
+            username=str(self._pos_id),
+            password=self._api_key,
+        )
+
+    async def __aenter__(self) -> "P24Client":
+        if self._client is None:
+            self._client = httpx.AsyncClient(auth=self._auth)
+            self._owns_client = True
         return self
 
     async def __aexit__(self, *exc) -> None:
@@ -61,13 +118,6 @@ class P24Client:
             self._client = None
             self._owns_client = False
 
-    def _get_auth(self) -> httpx.BasicAuth:
-        """Build HTTP Basic Auth credentials."""
-        return httpx.BasicAuth(
-            username=str(self.pos_id),
-            password=self.api_key,
-        )
-
     async def _request(
         self,
         method: str,
@@ -77,7 +127,9 @@ class P24Client:
         params: dict | None = None,
     ) -> httpx.Response:
         """Execute an authenticated HTTP request."""
-        headers = {"Content-Type": "application/json"} if content else {}
+        headers = (
+            {"Content-Type": "application/json"} if content is not None else {}
+        )
         if self._client is not None:
             return await self._client.request(
                 method,
@@ -85,10 +137,9 @@ class P24Client:
                 headers=headers,
                 content=content,
                 params=params,
+                auth=self._auth,
             )
-        async with httpx.AsyncClient(
-            auth=self._get_auth(),
-        ) as client:
+        async with httpx.AsyncClient(auth=self._auth) as client:
             return await client.request(
                 method,
                 url,
@@ -102,16 +153,21 @@ class P24Client:
 
         Appends the CRC key to the fields dict, serializes as
         compact JSON, and returns the SHA-384 hex digest.
+
+        P24 requires ``crc`` to be the last key of the signed
+        object, so the hash state cannot be pre-seeded with the
+        key; ``hashlib`` already dispatches to OpenSSL, which uses
+        the CPU's SHA extensions where available.
         """
         payload = {**fields, "crc": self.crc_key}
-        data = json.dumps(payload, separators=(",", ":"))
+        data = _SIGN_ENCODER.encode(payload)
         return hashlib.sha384(data.encode()).hexdigest()
 
     @staticmethod
     def _to_lowest_unit(amount: Decimal) -> int:
         """Convert a Decimal amount to integer lowest currency
         unit."""
-        return int(amount * 100)
+        return int(amount.scaleb(2))
 
     @staticmethod
     def _from_lowest_unit(amount: int) -> Decimal:
@@ -121,10 +177,14 @@ class P24Client:
     async def test_access(self) -> bool:
         """Test API connection (GET /api/v1/testAccess).
 
+        On a client entered as a context manager or built with a
+        shared ``http_client``, this also opens the pooled
+        connection, so it can be used to warm up before traffic.
+
         :return: True if connection is valid.
         :raises CredentialsError: If credentials are invalid.
         """
-        url = f"{self.base_url}/api/v1/testAccess"
+        url = self._url_test_access
         self.last_response = await self._request("GET", url)
         if self.last_response.status_code == 200:
             return self.last_response.json().get("data", False)
@@ -164,7 +224,7 @@ class P24Client:
         :param url_status: Callback URL for notifications.
         :return: Response with token for redirect.
         """
-        url = f"{self.base_url}/api/v1/transaction/register"
+        url = self._url_register
         amount_int = self._to_lowest_unit(amount)
         sign_fields = {
             "sessionId": session_id,
@@ -184,20 +244,19 @@ class P24Client:
             "urlStatus": url_status,
             "sign": self._calculate_sign(sign_fields),
         }
-        optional = {
-            "country": country,
-            "language": language,
-            "timeLimit": time_limit,
-            "channel": channel,
-            "waitForResult": wait_for_result,
-            "transferLabel": transfer_label,
-            "methodRefId": method_ref_id,
-        }
-        for key, value in optional.items():
+        for key, value in (
+            ("country", country),
+            ("language", language),
+            ("timeLimit", time_limit),
+            ("channel", channel),
+            ("waitForResult", wait_for_result),
+            ("transferLabel", transfer_label),
+            ("methodRefId", method_ref_id),
+        ):
             if value is not None:
                 data[key] = value
 
-        encoded = json.dumps(data, default=str)
+        encoded = _BODY_ENCODER.encode(data)
         self.last_response = await self._request(
             "POST",
             url,
@@ -232,7 +291,7 @@ class P24Client:
         :param currency: ISO 4217 currency code.
         :return: Verification response.
         """
-        url = f"{self.base_url}/api/v1/transaction/verify"
+        url = self._url_verify
         amount_int = self._to_lowest_unit(amount)
         sign_fields = {
             "sessionId": session_id,
@@ -249,7 +308,7 @@ class P24Client:
             "currency": currency,
             "sign": self._calculate_sign(sign_fields),
         }
-        encoded = json.dumps(data, default=str)
+        encoded = _BODY_ENCODER.encode(data)
         self.last_response = await self._request(
             "PUT",
             url,
@@ -283,14 +342,14 @@ class P24Client:
             amount).
         :return: Refund response.
         """
-        url = f"{self.base_url}/api/v1/transaction/refund"
+        url = self._url_refund
         data = {
             "requestId": request_id,
             "refundsUuid": refunds_uuid,
             "urlStatus": url_status,
             "refunds": refunds,
         }
-        encoded = json.dumps(data, default=str)
+        encoded = _BODY_ENCODER.encode(data)
         self.last_response = await self._request(
             "POST",
             url,
@@ -314,7 +373,7 @@ class P24Client:
         :param session_id: Session ID to look up.
         :return: Transaction info response.
         """
-        url = f"{self.base_url}/api/v1/transaction/by/sessionId/{session_id}"
+        url = f"{self._url_transaction_by_session}{session_id}"
         self.last_response = await self._request("GET", url)
         if self.last_response.status_code == 200:
             return self.last_response.json()
@@ -334,7 +393,7 @@ class P24Client:
         :param order_id: P24 order ID.
         :return: Refund info response.
         """
-        url = f"{self.base_url}/api/v1/refund/by/orderId/{order_id}"
+        url = f"{self._url_refund_by_order}{order_id}"
         self.last_response = await self._request("GET", url)
         if self.last_response.status_code == 200:
             return self.last_response.json()
@@ -359,7 +418,7 @@ class P24Client:
         :param currency: Optional currency filter.
         :return: Payment methods response.
         """
-        url = f"{self.base_url}/api/v1/payment/methods/{lang}"
+        url = f"{self._url_payment_methods}{lang}"
         params: dict = {}
         if amount is not None:
             params["amount"] = amount
@@ -383,4 +442,4 @@ class P24Client:
         :param token: Token from register_transaction response.
         :return: Full URL to redirect the buyer to.
         """
-        return f"{self.base_url}/trnRequest/{token}"
+        return f"{self._url_redirect}{token}"
@@ -3,7 +3,7 @@
 import contextlib
 import hmac as hmac_mod
 import logging
-import uuid
+import secrets
 from decimal import Decimal
 from typing import ClassVar
 
@@ -21,6 +21,14 @@ from .types import TransactionStatus
 
 logger = logging.getLogger(__name__)
 
+# Maps P24 transaction status codes to payment FSM triggers.
+_STATUS_TRIGGERS: dict[int, str | None] = {
+    TransactionStatus.NO_PAYMENT: None,
+    TransactionStatus.ADVANCE_PAYMENT: "confirm_prepared",
+    TransactionStatus.PAYMENT_MADE: "confirm_payment",
+    TransactionStatus.PAYMENT_RETURNED: "confirm_refund",
+}
+
 
 class P24Processor(BaseProcessor):
     """Przelewy24 payment gateway processor.
@@ -37,15 +45,25 @@ class P24Processor(BaseProcessor):
     sandbox_url: ClassVar[str] = "https://sandbox.przelewy24.pl"
     production_url: ClassVar[str] = "https://secure.przelewy24.pl"
 
+    _client: P24Client | None = None
+
     def _get_client(self) -> P24Client:
-        """Create a P24Client from processor config."""
-        return P24Client(
-            merchant_id=self.get_setting("merchant_id"),
-            pos_id=self.get_setting("pos_id"),
-            api_key=self.get_setting("api_key"),
-            crc_key=self.get_setting("crc_key"),
-            sandbox=self.get_setting("sandbox", True),
-        )
+        """Return the P24Client for this processor.
+
+        The client is created from processor config on first use
+        and reused afterwards. An ``http_client`` setting, if given,
+        is shared so connections are pooled across processors.
+        """
+        if self._client is None:
+            self._client = P24Client(
+                merchant_id=self.get_setting("merchant_id"),
+                pos_id=self.get_setting("pos_id"),
+                api_key=self.get_setting("api_key"),
+                crc_key=self.get_setting("crc_key"),
+                sandbox=self.get_setting("sandbox", True),
+                http_client=self.get_setting("http_client"),
+            )
+        return self._client
 
     def _resolve_url(self, url_template: str) -> str:
         """Replace {payment_id} placeholder."""
@@ -206,15 +224,8 @@ class P24Processor(BaseProcessor):
         tx_data = response.get("data", {})
         status = tx_data.get("status")
 
-        status_map = {
-            TransactionStatus.NO_PAYMENT: None,
-            TransactionStatus.ADVANCE_PAYMENT: "confirm_prepared",
-            TransactionStatus.PAYMENT_MADE: "confirm_payment",
-            TransactionStatus.PAYMENT_RETURNED: "confirm_refund",
-        }
-
         return PaymentStatusResponse(
-            status=status_map.get(status),
+            status=_STATUS_TRIGGERS.get(status),
         )
 
     async def charge(
@@ -247,8 +258,8 @@ class P24Processor(BaseProcessor):
             refund_url_status = self._resolve_url(refund_url_status)
 
         await client.refund(
-            request_id=str(uuid.uuid4()),
-            refunds_uuid=str(uuid.uuid4()),
+            request_id=secrets.token_hex(16),
+            refunds_uuid=secrets.token_hex(16),
             url_status=refund_url_status,
             refunds=[
                 {
@@ -1,56 +1,121 @@
 """Shared test fixtures for python-getpaid-przelewy24."""
 
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
 from decimal import Decimal
-from unittest.mock import MagicMock
+from types import MappingProxyType
 
+import httpx
 import pytest
 from getpaid_core.enums import PaymentStatus
 from getpaid_core.fsm import create_payment_machine
 
+from getpaid_przelewy24.processor import P24Processor
+
+
+DEFAULT_AMOUNT = Decimal("100.00")
+ZERO = Decimal("0")
+
+_COMPACT_JSON = json.JSONEncoder(separators=(",", ":"))
+
+
+def reference_sign(fields: dict, crc: str) -> str:
+    """Compute a P24 SHA-384 sign the way P24 documents it.
+
+    Independent of ``P24Client`` so tests can check its output.
+    """
+    payload = _COMPACT_JSON.encode({**fields, "crc": crc})
+    return hashlib.sha384(payload.encode()).hexdigest()
+
+
+# Shared, read-only buyer data; no test mutates it.
+BUYER_INFO = MappingProxyType(
+    {
+        "email": "john@example.com",
+        "first_name": "John",
+        "last_name": "Doe",
+    }
+)
+
+
+@dataclass(slots=True, frozen=True)
+class FakeOrder:
+    """Plain stand-in for the Order protocol."""
+
+    amount: Decimal = DEFAULT_AMOUNT
+    currency: str = "PLN"
+
+    def get_total_amount(self) -> Decimal:
+        return self.amount
+
+    def get_buyer_info(self) -> Mapping[str, str]:
+        return BUYER_INFO
+
+    def get_description(self) -> str:
+        return "Test order"
+
+    def get_currency(self) -> str:
+        return self.currency
+
+    def get_items(self) -> list[dict]:
+        return [
+            {
+                "name": "Product 1",
+                "quantity": 1,
+                "unit_price": self.amount,
+            }
+        ]
+
+    def get_return_url(self) -> str:
+        return "https://shop.example.com/success"
+
+
+@dataclass(slots=True)
+class StubPayment:
+    """Plain stand-in for the Payment protocol, without an FSM."""
+
+    id: str
+    order: FakeOrder
+    amount_required: Decimal
+    currency: str
+    status: str
+    external_id: str
+    backend: str = "przelewy24"
+    description: str = "Test order"
+    amount_paid: Decimal = ZERO
+    amount_locked: Decimal = ZERO
+    amount_refunded: Decimal = ZERO
+    fraud_status: str = "unknown"
+    fraud_message: str = ""
+
+    def is_fully_paid(self) -> bool:
+        return True
+
+    def is_fully_refunded(self) -> bool:
+        return False
+
 
 def make_mock_payment(
     *,
     payment_id: str = "test-payment-123",
     external_id: str = "",
-    amount: Decimal = Decimal("100.00"),
+    amount: Decimal = DEFAULT_AMOUNT,
     currency: str = "PLN",
     status: str = PaymentStatus.NEW,
-) -> MagicMock:
-    """Create a mock payment satisfying the Payment protocol."""
-    order = MagicMock()
-    order.get_total_amount.return_value = amount
-    order.get_buyer_info.return_value = {
-        "email": "john@example.com",
-        "first_name": "John",
-        "last_name": "Doe",
-    }
-    order.get_description.return_value = "Test order"
-    order.get_currency.return_value = currency
-    order.get_items.return_value = [
-        {"name": "Product 1", "quantity": 1, "unit_price": amount}
-    ]
-    order.get_return_url.return_value = "https://shop.example.com/success"
-
-    payment = MagicMock()
-    payment.id = payment_id
-    payment.order = order
-    payment.amount_required = amount
-    payment.currency = currency
-    payment.status = status
-    payment.backend = "przelewy24"
-    payment.external_id = external_id
-    payment.description = "Test order"
-    payment.amount_paid = Decimal("0")
-    payment.amount_locked = Decimal("0")
-    payment.amount_refunded = Decimal("0")
-    payment.fraud_status = "unknown"
-    payment.fraud_message = ""
-
-    # Needed by FSM guards
-    payment.is_fully_paid.return_value = True
-    payment.is_fully_refunded.return_value = False
-
-    return payment
+    amount_paid: Decimal = ZERO,
+) -> StubPayment:
+    """Create a payment stub satisfying the Payment protocol."""
+    return StubPayment(
+        id=payment_id,
+        order=FakeOrder(amount=amount, currency=currency),
+        amount_required=amount,
+        currency=currency,
+        status=status,
+        external_id=external_id,
+        amount_paid=amount_paid,
+    )
 
 
 class FakePayment:
@@ -58,51 +123,38 @@ class FakePayment:
 
     MagicMock cannot be used with ``transitions`` because it
     responds to ``hasattr`` for every attribute, causing the
-    library to skip binding trigger methods.
+    library to skip binding trigger methods. For the same reason it
+    is not slotted: the FSM sets trigger methods on the instance.
+
+    Attributes every test starts with are class-level defaults; the
+    FSM callbacks shadow them per instance when they change.
     """
 
+    backend: str = "przelewy24"
+    description: str = "Test order"
+    amount_paid: Decimal = ZERO
+    amount_locked: Decimal = ZERO
+    amount_refunded: Decimal = ZERO
+    fraud_status: str = "unknown"
+    fraud_message: str = ""
+
     def __init__(
         self,
         *,
         payment_id: str = "test-payment-123",
         external_id: str = "",
-        amount: Decimal = Decimal("100.00"),
+        amount: Decimal = DEFAULT_AMOUNT,
         currency: str = "PLN",
         status: str = PaymentStatus.NEW,
         is_fully_paid: bool = True,
         is_fully_refunded: bool = False,
     ) -> None:
         self.id = payment_id
-        self.order = MagicMock()
-        self.order.get_total_amount.return_value = amount
-        self.order.get_buyer_info.return_value = {
-            "email": "john@example.com",
-            "first_name": "John",
-            "last_name": "Doe",
-        }
-        self.order.get_description.return_value = "Test order"
-        self.order.get_currency.return_value = currency
-        self.order.get_items.return_value = [
-            {
-                "name": "Product 1",
-                "quantity": 1,
-                "unit_price": amount,
-            }
-        ]
-        self.order.get_return_url.return_value = (
-            "https://shop.example.com/success"
-        )
+        self.order = FakeOrder(amount=amount, currency=currency)
         self.amount_required = amount
         self.currency = currency
         self.status = status
-        self.backend = "przelewy24"
         self.external_id = external_id
-        self.description = "Test order"
-        self.amount_paid = Decimal("0")
-        self.amount_locked = Decimal("0")
-        self.amount_refunded = Decimal("0")
-        self.fraud_status = "unknown"
-        self.fraud_message = ""
         self._is_fully_paid = is_fully_paid
         self._is_fully_refunded = is_fully_refunded
 
@@ -113,6 +165,49 @@ class FakePayment:
         return self._is_fully_refunded
 
 
+def make_fsm_payment(**kwargs) -> FakePayment:
+    """Create a FakePayment with the payment FSM attached.
+
+    Accepts the same keyword arguments as ``FakePayment``.
+    """
+    payment = FakePayment(**kwargs)
+    create_payment_machine(payment)
+    return payment
+
+
+# Loading the CA bundle is what makes ``httpx.AsyncClient()`` slow;
+# clients built with ``verify=SSL_CONTEXT`` reuse one loaded context.
+SSL_CONTEXT = httpx.create_ssl_context()
+
+
+@pytest.fixture
+async def http_client():
+    """httpx client for one test, bound to that test's event loop."""
+    async with httpx.AsyncClient(verify=SSL_CONTEXT) as client:
+        yield client
+
+
+def make_processor(
+    payment=None,
+    config=None,
+    *,
+    http_client: httpx.AsyncClient | None = None,
+) -> P24Processor:
+    """Create a P24Processor with the default payment and config.
+
+    ``http_client`` is passed through the ``http_client`` setting;
+    without it the client falls back to a new ``AsyncClient`` per
+    request.
+    """
+    if payment is None:
+        payment = make_mock_payment()
+    if config is None:
+        config = P24_CONFIG
+    if http_client is not None:
+        config = {**config, "http_client": http_client}
+    return P24Processor(payment=payment, config=config)
+
+
 @pytest.fixture
 def mock_payment():
     """Fresh mock payment in NEW status."""
@@ -122,25 +217,29 @@ def mock_payment():
 @pytest.fixture
 def mock_payment_with_fsm():
     """Mock payment with FSM attached (has trigger methods)."""
-    payment = FakePayment()
-    create_payment_machine(payment)
-    return payment
-
-
-P24_CONFIG = {
-    "merchant_id": 12345,
-    "pos_id": 12345,
-    "api_key": "test-api-key-abc123",
-    "crc_key": "test-crc-key-xyz789",
-    "sandbox": True,
-    "url_status": ("https://shop.example.com/payments/callback/{payment_id}"),
-    "url_return": ("https://shop.example.com/payments/success/{payment_id}"),
-    "refund_url_status": (
-        "https://shop.example.com/payments/refund-callback/{payment_id}"
-    ),
-}
+    return make_fsm_payment()
+
+
+P24_CONFIG = MappingProxyType(
+    {
+        "merchant_id": 12345,
+        "pos_id": 12345,
+        "api_key": "test-api-key-abc123",
+        "crc_key": "test-crc-key-xyz789",
+        "sandbox": True,
+        "url_status": (
+            "https://shop.example.com/payments/callback/{payment_id}"
+        ),
+        "url_return": (
+            "https://shop.example.com/payments/success/{payment_id}"
+        ),
+        "refund_url_status": (
+            "https://shop.example.com/payments/refund-callback/{payment_id}"
+        ),
+    }
+)
 
 
 @pytest.fixture
 def p24_config():
-    return P24_CONFIG.copy()
+    return P24_CONFIG
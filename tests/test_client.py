@@ -1,9 +1,10 @@
 """Comprehensive tests for P24Client."""
 
-import hashlib
+import base64
 import json
 from decimal import Decimal
 
+import httpx
 import pytest
 from getpaid_core.exceptions import CommunicationError
 from getpaid_core.exceptions import CredentialsError
@@ -12,11 +13,20 @@ from getpaid_core.exceptions import RefundFailure
 
 from getpaid_przelewy24.client import P24Client
 
+from .conftest import reference_sign
+
 
 SANDBOX_URL = "https://sandbox.przelewy24.pl"
 REGISTER_URL = f"{SANDBOX_URL}/api/v1/transaction/register"
 VERIFY_URL = f"{SANDBOX_URL}/api/v1/transaction/verify"
 TEST_ACCESS_URL = f"{SANDBOX_URL}/api/v1/testAccess"
+REFUND_URL = f"{SANDBOX_URL}/api/v1/transaction/refund"
+TRANSACTION_URL = f"{SANDBOX_URL}/api/v1/transaction/by/sessionId/sess-1"
+REFUND_INFO_URL = f"{SANDBOX_URL}/api/v1/refund/by/orderId/999"
+PAYMENT_METHODS_URL = f"{SANDBOX_URL}/api/v1/payment/methods/pl"
+
+# Amount used in register/verify calls; sent as 1000 grosze.
+AMOUNT = Decimal("10.00")
 
 
 def _make_client(
@@ -26,6 +36,7 @@ def _make_client(
     api_key: str = "test-api-key",
     crc_key: str = "test-crc-key",
     sandbox: bool = True,
+    http_client: httpx.AsyncClient | None = None,
 ) -> P24Client:
     return P24Client(
         merchant_id=merchant_id,
@@ -33,134 +44,226 @@ def _make_client(
         api_key=api_key,
         crc_key=crc_key,
         sandbox=sandbox,
+        http_client=http_client,
     )
 
 
-class TestSign:
-    """Tests for P24Client._calculate_sign."""
-
-    def test_register_sign(self):
-        """Sign for registration uses sessionId, merchantId,
-        amount, currency, crc."""
-        client = _make_client(crc_key="my-crc")
-        sign = client._calculate_sign(
-            {
-                "sessionId": "sess-1",
-                "merchantId": 12345,
-                "amount": 100,
-                "currency": "PLN",
-            }
-        )
-        payload = json.dumps(
-            {
-                "sessionId": "sess-1",
-                "merchantId": 12345,
-                "amount": 100,
-                "currency": "PLN",
-                "crc": "my-crc",
-            },
-            separators=(",", ":"),
-        )
-        expected = hashlib.sha384(payload.encode()).hexdigest()
-        assert sign == expected
-
-    def test_verify_sign(self):
-        """Sign for verification uses sessionId, orderId,
-        amount, currency, crc."""
-        client = _make_client(crc_key="my-crc")
-        sign = client._calculate_sign(
-            {
-                "sessionId": "sess-1",
-                "orderId": 999,
-                "amount": 100,
-                "currency": "PLN",
-            }
-        )
-        payload = json.dumps(
-            {
-                "sessionId": "sess-1",
-                "orderId": 999,
-                "amount": 100,
-                "currency": "PLN",
-                "crc": "my-crc",
-            },
-            separators=(",", ":"),
-        )
-        expected = hashlib.sha384(payload.encode()).hexdigest()
-        assert sign == expected
-
-    def test_notification_sign(self):
-        """Sign for notification verification uses many fields + crc."""
-        client = _make_client(crc_key="my-crc")
-        fields = {
+# Tests that inspect the outgoing request (URL, headers, body) use
+# ``fallback_client``, which has no ``http_client`` and so exercises
+# the per-request ``AsyncClient`` that deployments without the
+# ``http_client`` setting run. Tests that only check how a response is
+# handled use ``client``, which shares the per-test ``http_client``.
+
+
+@pytest.fixture
+def client(http_client) -> P24Client:
+    """Client with default credentials on the per-test httpx client."""
+    return _make_client(http_client=http_client)
+
+
+@pytest.fixture
+def fallback_client() -> P24Client:
+    """Client with default credentials and no ``http_client``."""
+    return _make_client()
+
+
+_REGISTER_SIGN_FIELDS = {
+    "sessionId": "sess-1",
+    "merchantId": 12345,
+    "amount": 100,
+    "currency": "PLN",
+}
+_VERIFY_SIGN_FIELDS = {
+    "sessionId": "sess-1",
+    "orderId": 999,
+    "amount": 100,
+    "currency": "PLN",
+}
+_NOTIFICATION_SIGN_FIELDS = {
+    "merchantId": 12345,
+    "posId": 12345,
+    "sessionId": "sess-1",
+    "amount": 100,
+    "originAmount": 100,
+    "currency": "PLN",
+    "orderId": 999,
+    "methodId": 25,
+    "statement": "payment",
+}
+# CRC keys with characters needing escaping must sign the same as a
+# plain JSON serialization of the payload.
+_ESCAPED_CRC = 'k"e\\y-ż'
+
+# (fields, crc_key, expected sign), computed once at import.
+_SIGN_CASES = [
+    pytest.param(
+        fields,
+        crc,
+        reference_sign(fields, crc),
+        id=case_id,
+    )
+    for case_id, fields, crc in [
+        ("register", _REGISTER_SIGN_FIELDS, "my-crc"),
+        ("verify", _VERIFY_SIGN_FIELDS, "my-crc"),
+        ("notification", _NOTIFICATION_SIGN_FIELDS, "my-crc"),
+        (
+            "escaped-crc",
+            {"sessionId": "sess-1", "amount": 100},
+            _ESCAPED_CRC,
+        ),
+        ("empty-fields", {}, "my-crc"),
+        ("crc-in-fields", {"crc": "stale", "amount": 100}, "my-crc"),
+    ]
+]
+
+
+# Full request bodies expected for the default client's calls. The
+# sign is deterministic for a fixed CRC key, so it is included too.
+_EXPECTED_REGISTER_BODY = {
+    "merchantId": 12345,
+    "posId": 12345,
+    "sessionId": "sess-1",
+    "amount": 1000,
+    "currency": "PLN",
+    "description": "Test payment",
+    "email": "john@example.com",
+    "urlReturn": "https://shop.example.com/return",
+    "urlStatus": "https://shop.example.com/callback",
+    "sign": reference_sign(
+        {
+            "sessionId": "sess-1",
             "merchantId": 12345,
-            "posId": 12345,
+            "amount": 1000,
+            "currency": "PLN",
+        },
+        "test-crc-key",
+    ),
+}
+_EXPECTED_VERIFY_BODY = {
+    "merchantId": 12345,
+    "posId": 12345,
+    "sessionId": "sess-1",
+    "orderId": 999,
+    "amount": 1000,
+    "currency": "PLN",
+    "sign": reference_sign(
+        {
             "sessionId": "sess-1",
-            "amount": 100,
-            "originAmount": 100,
+            "orderId": 999,
+            "amount": 1000,
             "currency": "PLN",
+        },
+        "test-crc-key",
+    ),
+}
+_EXPECTED_REFUND_BODY = {
+    "requestId": "req-1",
+    "refundsUuid": "uuid-1",
+    "urlStatus": "https://shop.example.com/refund-callback",
+    "refunds": [
+        {
             "orderId": 999,
-            "methodId": 25,
-            "statement": "payment",
+            "sessionId": "sess-1",
+            "amount": 1000,
         }
-        sign = client._calculate_sign(fields)
-        payload = json.dumps(
-            {**fields, "crc": "my-crc"},
-            separators=(",", ":"),
-        )
-        expected = hashlib.sha384(payload.encode()).hexdigest()
-        assert sign == expected
+    ],
+}
 
 
-class TestAmountConversion:
-    """Tests for _to_lowest_unit and _from_lowest_unit."""
+class TestSign:
+    """Tests for P24Client._calculate_sign."""
 
-    def test_to_lowest_unit_decimal(self):
-        assert P24Client._to_lowest_unit(Decimal("1.23")) == 123
+    @pytest.mark.parametrize(("fields", "crc", "expected"), _SIGN_CASES)
+    def test_sign(self, fields, crc, expected):
+        """Sign is SHA-384 of the compact JSON fields with crc last."""
+        client = _make_client(crc_key=crc)
+        assert client._calculate_sign(fields) == expected
 
-    def test_to_lowest_unit_integer(self):
-        assert P24Client._to_lowest_unit(Decimal("100")) == 10000
+    def test_sign_follows_reassigned_crc_key(self):
+        client = _make_client(crc_key="old-crc")
+        client.crc_key = "new-crc"
+        assert client._calculate_sign(_REGISTER_SIGN_FIELDS) == (
+            reference_sign(_REGISTER_SIGN_FIELDS, "new-crc")
+        )
 
-    def test_to_lowest_unit_small(self):
-        assert P24Client._to_lowest_unit(Decimal("0.01")) == 1
 
-    def test_from_lowest_unit(self):
-        assert P24Client._from_lowest_unit(123) == Decimal("1.23")
+class TestAmountConversion:
+    """Tests for _to_lowest_unit and _from_lowest_unit."""
 
-    def test_from_lowest_unit_large(self):
-        assert P24Client._from_lowest_unit(10000) == Decimal("100.00")
+    @pytest.mark.parametrize(
+        ("amount", "expected"),
+        [
+            pytest.param(Decimal("1.23"), 123, id="decimal"),
+            pytest.param(Decimal("100"), 10000, id="integer"),
+            pytest.param(Decimal("0.01"), 1, id="small"),
+        ],
+    )
+    def test_to_lowest_unit(self, amount, expected):
+        assert P24Client._to_lowest_unit(amount) == expected
+
+    @pytest.mark.parametrize(
+        ("amount", "expected"),
+        [
+            pytest.param(123, Decimal("1.23"), id="decimal"),
+            pytest.param(10000, Decimal("100.00"), id="large"),
+        ],
+    )
+    def test_from_lowest_unit(self, amount, expected):
+        assert P24Client._from_lowest_unit(amount) == expected
 
 
 class TestTestAccess:
     """Tests for test_access (connection check)."""
 
-    async def test_test_access_success(self, respx_mock):
+    async def test_test_access_success(self, respx_mock, client):
         respx_mock.get(TEST_ACCESS_URL).respond(
             json={"data": True}, status_code=200
         )
-        client = _make_client()
         result = await client.test_access()
         assert result is True
 
-    async def test_test_access_failure(self, respx_mock):
+    async def test_test_access_failure(self, respx_mock, client):
         respx_mock.get(TEST_ACCESS_URL).respond(status_code=401)
-        client = _make_client()
         with pytest.raises(CredentialsError):
             await client.test_access()
 
+    async def test_reassigned_credentials_are_sent(
+        self, respx_mock, fallback_client
+    ):
+        route = respx_mock.get(TEST_ACCESS_URL).respond(
+            json={"data": True}, status_code=200
+        )
+        fallback_client.pos_id = 777
+        fallback_client.api_key = "rotated-key"
+        await fallback_client.test_access()
+        expected = "Basic " + base64.b64encode(b"777:rotated-key").decode()
+        assert route.calls.last.request.headers["authorization"] == expected
+
+    async def test_reassigned_base_url_is_used(
+        self, respx_mock, fallback_client
+    ):
+        route = respx_mock.get(
+            "https://secure.przelewy24.pl/api/v1/testAccess"
+        ).respond(json={"data": True}, status_code=200)
+        fallback_client.base_url = "https://secure.przelewy24.pl"
+        assert await fallback_client.test_access() is True
+        assert route.call_count == 1
+        assert fallback_client.get_transaction_redirect_url("TKN") == (
+            "https://secure.przelewy24.pl/trnRequest/TKN"
+        )
+
 
 class TestRegisterTransaction:
     """Tests for register_transaction."""
 
-    async def test_register_success(self, respx_mock):
+    async def test_register_success(self, respx_mock, client):
         respx_mock.post(REGISTER_URL).respond(
             json={"data": {"token": "TKN-ABC123"}},
             status_code=200,
         )
-        client = _make_client()
         result = await client.register_transaction(
             session_id="sess-1",
-            amount=Decimal("10.00"),
+            amount=AMOUNT,
             currency="PLN",
             description="Test payment",
             email="john@example.com",
@@ -169,15 +272,16 @@ class TestRegisterTransaction:
         )
         assert result["data"]["token"] == "TKN-ABC123"
 
-    async def test_register_sends_correct_body(self, respx_mock):
+    async def test_register_sends_correct_body(
+        self, respx_mock, fallback_client
+    ):
         route = respx_mock.post(REGISTER_URL).respond(
             json={"data": {"token": "TKN-ABC123"}},
             status_code=200,
         )
-        client = _make_client()
-        await client.register_transaction(
+        await fallback_client.register_transaction(
             session_id="sess-1",
-            amount=Decimal("10.00"),
+            amount=AMOUNT,
             currency="PLN",
             description="Test payment",
             email="john@example.com",
@@ -185,24 +289,16 @@ class TestRegisterTransaction:
             url_status="https://shop.example.com/callback",
         )
         body = json.loads(route.calls.last.request.content)
-        assert body["sessionId"] == "sess-1"
-        assert body["amount"] == 1000
-        assert body["currency"] == "PLN"
-        assert body["description"] == "Test payment"
-        assert body["email"] == "john@example.com"
-        assert body["merchantId"] == 12345
-        assert body["posId"] == 12345
-        assert "sign" in body
-
-    async def test_register_uses_basic_auth(self, respx_mock):
+        assert body == _EXPECTED_REGISTER_BODY
+
+    async def test_register_uses_basic_auth(self, respx_mock, fallback_client):
         route = respx_mock.post(REGISTER_URL).respond(
             json={"data": {"token": "TKN-ABC123"}},
             status_code=200,
         )
-        client = _make_client()
-        await client.register_transaction(
+        await fallback_client.register_transaction(
             session_id="sess-1",
-            amount=Decimal("10.00"),
+            amount=AMOUNT,
             currency="PLN",
             description="Test",
             email="test@example.com",
@@ -213,16 +309,34 @@ class TestRegisterTransaction:
         auth_header = request.headers.get("authorization", "")
         assert auth_header.startswith("Basic ")
 
-    async def test_register_failure(self, respx_mock):
+    async def test_context_manager_uses_basic_auth(self, respx_mock):
+        route = respx_mock.post(REGISTER_URL).respond(
+            json={"data": {"token": "TKN-ABC123"}},
+            status_code=200,
+        )
+        async with _make_client() as client:
+            await client.register_transaction(
+                session_id="sess-1",
+                amount=AMOUNT,
+                currency="PLN",
+                description="Test",
+                email="test@example.com",
+                url_return="https://shop.example.com/return",
+                url_status="https://shop.example.com/callback",
+            )
+        expected = "Basic " + base64.b64encode(b"12345:test-api-key").decode()
+        request = route.calls.last.request
+        assert request.headers["authorization"] == expected
+
+    async def test_register_failure(self, respx_mock, client):
         respx_mock.post(REGISTER_URL).respond(
             json={"error": "Invalid data"},
             status_code=400,
         )
-        client = _make_client()
         with pytest.raises(LockFailure):
             await client.register_transaction(
                 session_id="sess-1",
-                amount=Decimal("10.00"),
+                amount=AMOUNT,
                 currency="PLN",
                 description="Test",
                 email="test@example.com",
@@ -230,15 +344,16 @@ class TestRegisterTransaction:
                 url_status="https://shop.example.com/callback",
             )
 
-    async def test_register_with_optional_params(self, respx_mock):
+    async def test_register_with_optional_params(
+        self, respx_mock, fallback_client
+    ):
         route = respx_mock.post(REGISTER_URL).respond(
             json={"data": {"token": "TKN-ABC123"}},
             status_code=200,
         )
-        client = _make_client()
-        await client.register_transaction(
+        await fallback_client.register_transaction(
             session_id="sess-1",
-            amount=Decimal("10.00"),
+            amount=AMOUNT,
             currency="PLN",
             description="Test",
             email="test@example.com",
@@ -261,52 +376,43 @@ class TestRegisterTransaction:
 class TestVerifyTransaction:
     """Tests for verify_transaction."""
 
-    async def test_verify_success(self, respx_mock):
+    async def test_verify_success(self, respx_mock, client):
         respx_mock.put(VERIFY_URL).respond(
             json={"data": {"status": "success"}},
             status_code=200,
         )
-        client = _make_client()
         result = await client.verify_transaction(
             session_id="sess-1",
             order_id=999,
-            amount=Decimal("10.00"),
+            amount=AMOUNT,
             currency="PLN",
         )
         assert result["data"]["status"] == "success"
 
-    async def test_verify_sends_correct_body(self, respx_mock):
+    async def test_verify_sends_correct_body(self, respx_mock, fallback_client):
         route = respx_mock.put(VERIFY_URL).respond(
             json={"data": {"status": "success"}},
             status_code=200,
         )
-        client = _make_client()
-        await client.verify_transaction(
+        await fallback_client.verify_transaction(
             session_id="sess-1",
             order_id=999,
-            amount=Decimal("10.00"),
+            amount=AMOUNT,
             currency="PLN",
         )
         body = json.loads(route.calls.last.request.content)
-        assert body["merchantId"] == 12345
-        assert body["posId"] == 12345
-        assert body["sessionId"] == "sess-1"
-        assert body["orderId"] == 999
-        assert body["amount"] == 1000
-        assert body["currency"] == "PLN"
-        assert "sign" in body
-
-    async def test_verify_failure(self, respx_mock):
+        assert body == _EXPECTED_VERIFY_BODY
+
+    async def test_verify_failure(self, respx_mock, client):
         respx_mock.put(VERIFY_URL).respond(
             json={"error": "Verification failed"},
             status_code=400,
         )
-        client = _make_client()
         with pytest.raises(CommunicationError):
             await client.verify_transaction(
                 session_id="sess-1",
                 order_id=999,
-                amount=Decimal("10.00"),
+                amount=AMOUNT,
                 currency="PLN",
             )
 
@@ -314,9 +420,8 @@ class TestVerifyTransaction:
 class TestRefund:
     """Tests for refund."""
 
-    async def test_refund_success(self, respx_mock):
-        refund_url = f"{SANDBOX_URL}/api/v1/transaction/refund"
-        respx_mock.post(refund_url).respond(
+    async def test_refund_success(self, respx_mock, client):
+        respx_mock.post(REFUND_URL).respond(
             json={
                 "data": [
                     {
@@ -330,7 +435,6 @@ class TestRefund:
             },
             status_code=200,
         )
-        client = _make_client()
         result = await client.refund(
             request_id="req-1",
             refunds_uuid="uuid-1",
@@ -345,14 +449,12 @@ class TestRefund:
         )
         assert result["responseCode"] == 0
 
-    async def test_refund_sends_correct_body(self, respx_mock):
-        refund_url = f"{SANDBOX_URL}/api/v1/transaction/refund"
-        route = respx_mock.post(refund_url).respond(
+    async def test_refund_sends_correct_body(self, respx_mock, fallback_client):
+        route = respx_mock.post(REFUND_URL).respond(
             json={"data": [], "responseCode": 0},
             status_code=200,
         )
-        client = _make_client()
-        await client.refund(
+        await fallback_client.refund(
             request_id="req-1",
             refunds_uuid="uuid-1",
             url_status="https://shop.example.com/refund-callback",
@@ -365,19 +467,13 @@ class TestRefund:
             ],
         )
         body = json.loads(route.calls.last.request.content)
-        assert body["requestId"] == "req-1"
-        assert body["refundsUuid"] == "uuid-1"
-        assert body["urlStatus"] == "https://shop.example.com/refund-callback"
-        assert len(body["refunds"]) == 1
-        assert body["refunds"][0]["orderId"] == 999
-
-    async def test_refund_failure(self, respx_mock):
-        refund_url = f"{SANDBOX_URL}/api/v1/transaction/refund"
-        respx_mock.post(refund_url).respond(
+        assert body == _EXPECTED_REFUND_BODY
+
+    async def test_refund_failure(self, respx_mock, client):
+        respx_mock.post(REFUND_URL).respond(
             json={"error": "Refund failed"},
             status_code=400,
         )
-        client = _make_client()
         with pytest.raises(RefundFailure):
             await client.refund(
                 request_id="req-1",
@@ -396,22 +492,18 @@ class TestRefund:
 class TestGetTransactionBySessionId:
     """Tests for get_transaction_by_session_id."""
 
-    async def test_get_transaction_success(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/transaction/by/sessionId/sess-1"
-        respx_mock.get(url).respond(
+    async def test_get_transaction_success(self, respx_mock, client):
+        respx_mock.get(TRANSACTION_URL).respond(
             json={"data": {"status": 2, "amount": 1000}},
             status_code=200,
         )
-        client = _make_client()
         result = await client.get_transaction_by_session_id("sess-1")
         assert result["data"]["status"] == 2
 
-    async def test_get_transaction_failure(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/transaction/by/sessionId/sess-1"
-        respx_mock.get(url).respond(
+    async def test_get_transaction_failure(self, respx_mock, client):
+        respx_mock.get(TRANSACTION_URL).respond(
             status_code=404, json={"error": "Not found"}
         )
-        client = _make_client()
         with pytest.raises(CommunicationError):
             await client.get_transaction_by_session_id("sess-1")
 
@@ -419,22 +511,18 @@ class TestGetTransactionBySessionId:
 class TestGetRefundByOrderId:
     """Tests for get_refund_by_order_id."""
 
-    async def test_get_refund_success(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/refund/by/orderId/999"
-        respx_mock.get(url).respond(
+    async def test_get_refund_success(self, respx_mock, client):
+        respx_mock.get(REFUND_INFO_URL).respond(
             json={"data": [{"orderId": 999, "amount": 1000, "status": 0}]},
             status_code=200,
         )
-        client = _make_client()
         result = await client.get_refund_by_order_id(999)
         assert len(result["data"]) == 1
 
-    async def test_get_refund_failure(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/refund/by/orderId/999"
-        respx_mock.get(url).respond(
+    async def test_get_refund_failure(self, respx_mock, client):
+        respx_mock.get(REFUND_INFO_URL).respond(
             status_code=404, json={"error": "Not found"}
         )
-        client = _make_client()
         with pytest.raises(CommunicationError):
             await client.get_refund_by_order_id(999)
 
@@ -442,34 +530,29 @@ class TestGetRefundByOrderId:
 class TestGetPaymentMethods:
     """Tests for get_payment_methods."""
 
-    async def test_get_methods_success(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/payment/methods/pl"
-        respx_mock.get(url).respond(
+    async def test_get_methods_success(self, respx_mock, client):
+        respx_mock.get(PAYMENT_METHODS_URL).respond(
             json={"data": [{"id": 25, "name": "BLIK", "status": True}]},
             status_code=200,
         )
-        client = _make_client()
         result = await client.get_payment_methods("pl")
         assert len(result["data"]) == 1
 
-    async def test_get_methods_with_amount(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/payment/methods/pl"
-        route = respx_mock.get(url).respond(
+    async def test_get_methods_with_amount(self, respx_mock, fallback_client):
+        route = respx_mock.get(PAYMENT_METHODS_URL).respond(
             json={"data": []},
             status_code=200,
         )
-        client = _make_client()
-        await client.get_payment_methods("pl", amount=1000, currency="PLN")
-        request_url = str(route.calls.last.request.url)
-        assert "amount=1000" in request_url
-        assert "currency=PLN" in request_url
+        await fallback_client.get_payment_methods(
+            "pl", amount=1000, currency="PLN"
+        )
+        params = route.calls.last.request.url.params
+        assert dict(params) == {"amount": "1000", "currency": "PLN"}
 
-    async def test_get_methods_failure(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/payment/methods/pl"
-        respx_mock.get(url).respond(
+    async def test_get_methods_failure(self, respx_mock, client):
+        respx_mock.get(PAYMENT_METHODS_URL).respond(
             status_code=401, json={"error": "Unauthorized"}
         )
-        client = _make_client()
         with pytest.raises(CommunicationError):
             await client.get_payment_methods("pl")
 
@@ -484,3 +567,21 @@ class TestAsyncContextManager:
         async with _make_client() as client:
             result = await client.test_access()
             assert result is True
+
+    async def test_shared_http_client_is_not_closed(self, respx_mock):
+        route = respx_mock.get(TEST_ACCESS_URL).respond(
+            json={"data": True}, status_code=200
+        )
+        async with httpx.AsyncClient() as http_client:
+            client = P24Client(
+                merchant_id=12345,
+                pos_id=12345,
+                api_key="test-api-key",
+                crc_key="test-crc-key",
+                http_client=http_client,
+            )
+            async with client:
+                assert await client.test_access() is True
+            assert not http_client.is_closed
+        auth_header = route.calls.last.request.headers["authorization"]
+        assert auth_header.startswith("Basic ")
@@ -3,39 +3,40 @@
 import json
 from decimal import Decimal
 
+import httpx
 import pytest
 from getpaid_core.exceptions import LockFailure
 
-from getpaid_przelewy24.processor import P24Processor
-
+from .conftest import DEFAULT_AMOUNT
 from .conftest import P24_CONFIG
 from .conftest import make_mock_payment
+from .conftest import make_processor
 
 
 SANDBOX_URL = "https://sandbox.przelewy24.pl"
 REGISTER_URL = f"{SANDBOX_URL}/api/v1/transaction/register"
 VERIFY_URL = f"{SANDBOX_URL}/api/v1/transaction/verify"
 REFUND_URL = f"{SANDBOX_URL}/api/v1/transaction/refund"
+BY_SESSION_URL = (
+    f"{SANDBOX_URL}/api/v1/transaction/by/sessionId/test-payment-123"
+)
 
+PARTIAL_REFUND = Decimal("50.00")
 
-def _make_processor(payment=None, config=None):
-    """Create a P24Processor with defaults."""
-    if payment is None:
-        payment = make_mock_payment()
-    if config is None:
-        config = P24_CONFIG.copy()
-    return P24Processor(payment=payment, config=config)
+# Canned gateway response bodies shared by the tests; respx serializes
+# them per response, so tests must not mutate them.
+REGISTER_RESPONSE = {"data": {"token": "TKN-ABC123"}}
 
 
 class TestPrepareTransaction:
     """Tests for prepare_transaction."""
 
-    async def test_prepare_returns_redirect(self, respx_mock):
+    async def test_prepare_returns_redirect(self, respx_mock, http_client):
         respx_mock.post(REGISTER_URL).respond(
-            json={"data": {"token": "TKN-ABC123"}},
+            json=REGISTER_RESPONSE,
             status_code=200,
         )
-        processor = _make_processor()
+        processor = make_processor(http_client=http_client)
         result = await processor.prepare_transaction()
 
         assert result["redirect_url"] == (
@@ -46,10 +47,12 @@ class TestPrepareTransaction:
 
     async def test_prepare_sends_correct_data(self, respx_mock):
         route = respx_mock.post(REGISTER_URL).respond(
-            json={"data": {"token": "TKN-ABC123"}},
+            json=REGISTER_RESPONSE,
             status_code=200,
         )
-        processor = _make_processor()
+        # No http_client=, so the request goes through the per-call
+        # AsyncClient fallback that deployments without the setting use.
+        processor = make_processor()
         await processor.prepare_transaction()
 
         body = json.loads(route.calls.last.request.content)
@@ -67,99 +70,112 @@ class TestPrepareTransaction:
             == "https://shop.example.com/payments/success/test-payment-123"
         )
 
-    async def test_prepare_failure_raises(self, respx_mock):
+    async def test_prepare_failure_raises(self, respx_mock, http_client):
         respx_mock.post(REGISTER_URL).respond(
             json={"error": "Bad request"},
             status_code=400,
         )
-        processor = _make_processor()
+        processor = make_processor(http_client=http_client)
         with pytest.raises(LockFailure):
             await processor.prepare_transaction()
 
-    async def test_custom_customer_ip_passed(self, respx_mock):
+    async def test_custom_customer_ip_passed(self, respx_mock, http_client):
         route = respx_mock.post(REGISTER_URL).respond(
-            json={"data": {"token": "TKN-ABC123"}},
+            json=REGISTER_RESPONSE,
             status_code=200,
         )
-        processor = _make_processor()
+        processor = make_processor(http_client=http_client)
         await processor.prepare_transaction(customer_ip="192.168.1.1")
         # customer_ip isn't a P24 field — just verify it doesn't crash
         assert route.call_count == 1
 
+    async def test_prepare_through_shared_http_client(self):
+        """A configured http_client carries the request, so its
+        transport (here an in-memory one) sees the call."""
+        seen: list[httpx.Request] = []
 
-class TestFetchPaymentStatus:
-    """Tests for fetch_payment_status (PULL flow)."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json={"data": {"token": "TKN-1"}})
 
-    async def test_status_payment_made(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/transaction/by/sessionId/test-payment-123"
-        respx_mock.get(url).respond(
-            json={"data": {"status": 2, "amount": 10000}},
-            status_code=200,
-        )
-        processor = _make_processor()
-        result = await processor.fetch_payment_status()
-        assert result["status"] == "confirm_payment"
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            processor = make_processor(
+                config={**P24_CONFIG, "http_client": http_client},
+            )
+            result = await processor.prepare_transaction()
 
-    async def test_status_no_payment(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/transaction/by/sessionId/test-payment-123"
-        respx_mock.get(url).respond(
-            json={"data": {"status": 0}},
-            status_code=200,
-        )
-        processor = _make_processor()
-        result = await processor.fetch_payment_status()
-        assert result["status"] is None
+        assert result["redirect_url"] == f"{SANDBOX_URL}/trnRequest/TKN-1"
+        assert [str(r.url) for r in seen] == [REGISTER_URL]
+        assert seen[0].headers["authorization"].startswith("Basic ")
 
-    async def test_status_advance_payment(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/transaction/by/sessionId/test-payment-123"
-        respx_mock.get(url).respond(
-            json={"data": {"status": 1}},
-            status_code=200,
-        )
-        processor = _make_processor()
-        result = await processor.fetch_payment_status()
-        assert result["status"] == "confirm_prepared"
 
-    async def test_status_returned(self, respx_mock):
-        url = f"{SANDBOX_URL}/api/v1/transaction/by/sessionId/test-payment-123"
-        respx_mock.get(url).respond(
-            json={"data": {"status": 3}},
+class TestFetchPaymentStatus:
+    """Tests for fetch_payment_status (PULL flow)."""
+
+    @pytest.mark.parametrize(
+        ("p24_status", "expected"),
+        [
+            (0, None),
+            (1, "confirm_prepared"),
+            (2, "confirm_payment"),
+            (3, "confirm_refund"),
+        ],
+        ids=["no_payment", "advance_payment", "payment_made", "returned"],
+    )
+    async def test_status_mapping(
+        self, respx_mock, http_client, p24_status, expected
+    ):
+        respx_mock.get(BY_SESSION_URL).respond(
+            json={"data": {"status": p24_status, "amount": 10000}},
             status_code=200,
         )
-        processor = _make_processor()
+        processor = make_processor(http_client=http_client)
         result = await processor.fetch_payment_status()
-        assert result["status"] == "confirm_refund"
+        assert result["status"] == expected
 
 
 class TestCharge:
     """Tests that charge() raises NotImplementedError."""
 
-    async def test_charge_not_supported(self):
-        processor = _make_processor()
+    def test_charge_not_supported(self):
+        # charge() raises before its first await, so stepping the
+        # coroutine once is enough; no event loop is needed.
+        coro = make_processor().charge()
         with pytest.raises(NotImplementedError):
-            await processor.charge()
+            coro.send(None)
 
 
 class TestReleaseLock:
     """Tests that release_lock() raises NotImplementedError."""
 
-    async def test_release_lock_not_supported(self):
-        processor = _make_processor()
+    def test_release_lock_not_supported(self):
+        coro = make_processor().release_lock()
         with pytest.raises(NotImplementedError):
-            await processor.release_lock()
+            coro.send(None)
 
 
 class TestStartRefund:
     """Tests for start_refund method."""
 
-    async def test_start_refund_with_amount(self, respx_mock):
+    @pytest.mark.parametrize(
+        ("amount", "expected"),
+        [
+            (PARTIAL_REFUND, PARTIAL_REFUND),
+            (None, DEFAULT_AMOUNT),
+        ],
+        ids=["with_amount", "full_amount"],
+    )
+    async def test_start_refund(
+        self, respx_mock, http_client, amount, expected
+    ):
         respx_mock.post(REFUND_URL).respond(
             json={
                 "data": [
                     {
                         "orderId": 999,
                         "sessionId": "test-payment-123",
-                        "amount": 5000,
+                        "amount": int(expected * 100),
                         "status": 0,
                     }
                 ],
@@ -167,43 +183,51 @@ class TestStartRefund:
             },
             status_code=200,
         )
-        payment = make_mock_payment(external_id="999")
-        payment.amount_paid = Decimal("100.00")
-        processor = _make_processor(payment=payment)
-        result = await processor.start_refund(amount=Decimal("50.00"))
-        assert result == Decimal("50.00")
+        payment = make_mock_payment(
+            external_id="999", amount_paid=DEFAULT_AMOUNT
+        )
+        processor = make_processor(payment=payment, http_client=http_client)
+        result = await processor.start_refund(amount=amount)
+        assert result == expected
 
-    async def test_start_refund_full_amount(self, respx_mock):
-        respx_mock.post(REFUND_URL).respond(
-            json={
-                "data": [
-                    {
-                        "orderId": 999,
-                        "sessionId": "test-payment-123",
-                        "amount": 10000,
-                        "status": 0,
-                    }
-                ],
-                "responseCode": 0,
-            },
+    async def test_start_refund_sends_unique_ids(self, respx_mock, http_client):
+        route = respx_mock.post(REFUND_URL).respond(
+            json={"data": [], "responseCode": 0},
             status_code=200,
         )
-        payment = make_mock_payment(external_id="999")
-        payment.amount_paid = Decimal("100.00")
-        processor = _make_processor(payment=payment)
-        result = await processor.start_refund()
-        assert result == Decimal("100.00")
+        payment = make_mock_payment(
+            external_id="999", amount_paid=DEFAULT_AMOUNT
+        )
+        processor = make_processor(payment=payment, http_client=http_client)
+        await processor.start_refund()
+
+        body = json.loads(route.calls.last.request.content)
+        assert len(body["requestId"]) == 32
+        assert len(body["refundsUuid"]) == 32
+        assert body["requestId"] != body["refundsUuid"]
+        assert body["refunds"] == [
+            {
+                "orderId": 999,
+                "sessionId": "test-payment-123",
+                "amount": 10000,
+            }
+        ]
+
+
+@pytest.fixture(scope="class")
+def default_processor():
+    """Processor with default config, for read-only tests."""
+    return make_processor()
 
 
 class TestBuildPaywallContext:
     """Tests for _build_paywall_context."""
 
-    def test_builds_correct_structure(self):
-        processor = _make_processor()
-        context = processor._build_paywall_context()
+    def test_builds_correct_structure(self, default_processor):
+        context = default_processor._build_paywall_context()
 
         assert context["session_id"] == "test-payment-123"
-        assert context["amount"] == Decimal("100.00")
+        assert context["amount"] == DEFAULT_AMOUNT
         assert context["currency"] == "PLN"
         assert context["description"] == "Test order"
         assert context["email"] == "john@example.com"
@@ -215,17 +239,15 @@ class TestBuildPaywallContext:
         )
 
     def test_no_url_status_if_not_configured(self):
-        config = P24_CONFIG.copy()
-        del config["url_status"]
-        processor = _make_processor(config=config)
+        config = {k: v for k, v in P24_CONFIG.items() if k != "url_status"}
+        processor = make_processor(config=config)
         # Should not have url_status — will fall back to empty
         context = processor._build_paywall_context()
         assert context.get("url_status", "") == ""
 
     def test_no_url_return_if_not_configured(self):
-        config = P24_CONFIG.copy()
-        del config["url_return"]
-        processor = _make_processor(config=config)
+        config = {k: v for k, v in P24_CONFIG.items() if k != "url_return"}
+        processor = make_processor(config=config)
         context = processor._build_paywall_context()
         assert context.get("url_return", "") == ""
 
@@ -234,14 +256,24 @@ class TestGetClient:
     """Tests for _get_client helper."""
 
     def test_creates_client_with_sandbox(self):
-        processor = _make_processor()
+        processor = make_processor()
         client = processor._get_client()
         assert client.base_url == SANDBOX_URL
         assert client.merchant_id == 12345
 
     def test_creates_client_with_production(self):
-        config = P24_CONFIG.copy()
-        config["sandbox"] = False
-        processor = _make_processor(config=config)
+        config = {**P24_CONFIG, "sandbox": False}
+        processor = make_processor(config=config)
         client = processor._get_client()
         assert client.base_url == "https://secure.przelewy24.pl"
+
+    def test_reuses_client(self):
+        processor = make_processor()
+        assert processor._get_client() is processor._get_client()
+
+    async def test_uses_shared_http_client(self):
+        async with httpx.AsyncClient() as http_client:
+            config = {**P24_CONFIG, "http_client": http_client}
+            processor = make_processor(config=config)
+            client = processor._get_client()
+            assert client._client is http_client
@@ -6,42 +6,52 @@ from getpaid_przelewy24.types import TransactionStatus
 
 
 def test_currency_values():
-    assert Currency.PLN == "PLN"
-    assert Currency.EUR == "EUR"
-    assert Currency.GBP == "GBP"
-    assert Currency.CZK == "CZK"
-    assert Currency.USD == "USD"
-    assert Currency.BGN == "BGN"
-    assert Currency.DKK == "DKK"
-    assert Currency.HUF == "HUF"
-    assert Currency.NOK == "NOK"
-    assert Currency.SEK == "SEK"
-    assert Currency.CHF == "CHF"
-    assert Currency.RON == "RON"
-    assert Currency.HRK == "HRK"
-    assert len(Currency) == 13
+    assert {c.name: c.value for c in Currency} == {
+        code: code
+        for code in (
+            "PLN",
+            "EUR",
+            "GBP",
+            "CZK",
+            "USD",
+            "BGN",
+            "DKK",
+            "HUF",
+            "NOK",
+            "SEK",
+            "CHF",
+            "RON",
+            "HRK",
+        )
+    }
 
 
 def test_language_values():
-    assert Language.pl == "pl"
-    assert Language.en == "en"
-    assert Language.de == "de"
-    assert Language.es == "es"
-    assert Language.it == "it"
-    assert Language.cs == "cs"
-    assert Language.sk == "sk"
-    assert Language.fr == "fr"
-    assert Language.pt == "pt"
-    assert Language.hu == "hu"
-    assert Language.bg == "bg"
-    assert Language.ro == "ro"
-    assert Language.hr == "hr"
-    assert len(Language) == 13
+    assert {lang.name: lang.value for lang in Language} == {
+        code: code
+        for code in (
+            "pl",
+            "en",
+            "de",
+            "es",
+            "it",
+            "cs",
+            "sk",
+            "fr",
+            "pt",
+            "hu",
+            "bg",
+            "ro",
+            "hr",
+        )
+    }
 
 
 def test_transaction_status_values():
     """P24 transaction statuses from GET /transaction/by/sessionId."""
-    assert TransactionStatus.NO_PAYMENT == 0
-    assert TransactionStatus.ADVANCE_PAYMENT == 1
-    assert TransactionStatus.PAYMENT_MADE == 2
-    assert TransactionStatus.PAYMENT_RETURNED == 3
+    assert {s.name: s.value for s in TransactionStatus} == {
+        "NO_PAYMENT": 0,
+        "ADVANCE_PAYMENT": 1,
+        "PAYMENT_MADE": 2,
+        "PAYMENT_RETURNED": 3,
+    }